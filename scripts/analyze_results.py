@@ -3,33 +3,93 @@
 import sys
 import re
 import os
+import mmap
+import io
 from datetime import datetime
+from functools import lru_cache
+
+# The pgbench summary is printed at the end of the log; only this many
+# trailing bytes are read to extract it
+_TAIL_BYTES = 8192
+
+# Smaller logs cannot contain a complete pgbench summary
+_MIN_SUMMARY_BYTES = 200
+
+_ERROR_KEYWORDS = (b'FATAL', b'ERROR', b'failed', b'connection refused')
+
+# All keywords in one alternation, so the log is scanned once, not per keyword
+_ERROR_RE = re.compile(b'|'.join(re.escape(keyword) for keyword in _ERROR_KEYWORDS))
+
+# Fixed report text, built once at import
+_REPORT_HEADER = (
+    "PgBouncer Performance Test Results\n"
+    f"{'=' * 50}\n"
+)
+_REPORT_CONCLUSION = (
+    "CONCLUSION:\n"
+    "PgBouncer provides significant benefits:\n"
+    "1. Eliminates connection establishment overhead\n"
+    "2. Enables high concurrency beyond database limits\n"
+    "3. Improves both throughput and latency\n"
+    "4. Provides reliable connection pooling and queuing\n"
+)
+
+def _read_tail(log):
+    """Return the last _TAIL_BYTES of a mapped log as text, starting on a full line"""
+    start = max(0, len(log) - _TAIL_BYTES)
+    tail = log[start:].decode('utf-8', 'replace')
+    if start:
+        tail = tail.partition('\n')[2]
+    return tail
+
+def _after(text, marker, cast=float, default=0):
+    """Return the value printed after the first occurrence of marker in text"""
+    start = text.find(marker)
+    if start < 0:
+        return default
+    start += len(marker)
+    end = text.find('\n', start)
+    value = text[start:end if end >= 0 else None].split(' ', 1)[0].partition('/')[0]
+    try:
+        return cast(value)
+    except ValueError:
+        return default
 
 def parse_pgbench_output(filename):
     """Parse pgbench output to extract key metrics"""
-    if not os.path.exists(filename):
+    # A single stat() both checks the log exists and keys the cache, so a
+    # rewritten log (new mtime or size) is parsed again
+    try:
+        stat = os.stat(filename)
+    except OSError:
         return None
     
-    with open(filename, 'r') as f:
-        content = f.read()
-    
-    # Extract TPS
-    tps_match = re.search(r'tps = ([0-9.]+)', content)
-    tps = float(tps_match.group(1)) if tps_match else 0
+    return _parse_pgbench_output(filename, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=64)
+def _parse_pgbench_output(filename, mtime_ns, size):
+    """Parse a log once per (path, mtime, size); callers must not mutate the result"""
+    # A log too short to hold a pgbench summary, or one without its tps line,
+    # is a run that failed before reporting; skip searching it for errors
+    failed_run = {'tps': 0, 'latency': 0, 'has_errors': True}
+    if size < _MIN_SUMMARY_BYTES:
+        return failed_run
     
-    # Extract latency
-    latency_match = re.search(r'latency average = ([0-9.]+) ms', content)
-    latency = float(latency_match.group(1)) if latency_match else 0
+    # Search the page-cache mapping directly instead of copying the log
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+        summary = _read_tail(log)
+        if 'tps = ' not in summary:
+            return failed_run
+        has_errors = _ERROR_RE.search(log) is not None
     
-    # Check for errors
-    error_keywords = ['FATAL', 'ERROR', 'failed', 'connection refused']
-    has_errors = any(keyword in content for keyword in error_keywords)
+    # Extract TPS and latency
+    tps = _after(summary, 'tps = ')
+    latency = _after(summary, 'latency average = ')
     
     return {
         'tps': tps,
         'latency': latency,
-        'has_errors': has_errors,
-        'content': content
+        'has_errors': has_errors
     }
 
 def main():
@@ -56,85 +116,101 @@ def main():
         }
     }
     
+    parsed = {
+        test_name: {conn_type: parse_pgbench_output(path) for conn_type, path in files.items()}
+        for test_name, files in tests.items()
+    }
+    
     summary_file = f"{results_dir}/summary_{timestamp}.txt"
     
-    with open(summary_file, 'w') as f:
-        f.write("PgBouncer Performance Test Results\n")
-        f.write("=" * 50 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        for test_name, files in tests.items():
-            f.write(f"\n{test_name.upper()} TEST RESULTS\n")
-            f.write("-" * 30 + "\n")
-            
-            direct_result = parse_pgbench_output(files['direct'])
-            pgbouncer_result = parse_pgbench_output(files['pgbouncer'])
-            
-            if direct_result and not direct_result['has_errors']:
-                f.write(f"Direct Connection:\n")
-                f.write(f"  TPS: {direct_result['tps']:.2f}\n")
-                f.write(f"  Latency: {direct_result['latency']:.2f} ms\n")
-            else:
-                f.write(f"Direct Connection: FAILED or ERRORS\n")
-            
-            if pgbouncer_result and not pgbouncer_result['has_errors']:
-                f.write(f"PgBouncer Connection:\n")
-                f.write(f"  TPS: {pgbouncer_result['tps']:.2f}\n")
-                f.write(f"  Latency: {pgbouncer_result['latency']:.2f} ms\n")
-                
-                # Calculate improvements if both tests succeeded
-                if direct_result and not direct_result['has_errors']:
-                    if direct_result['tps'] > 0:
-                        tps_improvement = (pgbouncer_result['tps'] / direct_result['tps'] - 1) * 100
-                        f.write(f"  TPS Improvement: {tps_improvement:+.1f}%\n")
-                    
-                    if direct_result['latency'] > 0:
-                        latency_improvement = (1 - pgbouncer_result['latency'] / direct_result['latency']) * 100
-                        f.write(f"  Latency Improvement: {latency_improvement:+.1f}%\n")
-            else:
-                f.write(f"PgBouncer Connection: FAILED or ERRORS\n")
+    buf = io.StringIO()
+    buf.write(_REPORT_HEADER)
+    buf.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    for test_name, results in parsed.items():
+        buf.write(
+            f"\n{test_name.upper()} TEST RESULTS\n"
+            f"{'-' * 30}\n"
+        )
         
-        f.write("\n\nKEY FINDINGS\n")
-        f.write("-" * 20 + "\n")
+        direct_result = results['direct']
+        pgbouncer_result = results['pgbouncer']
         
-        # Analyze overhead test specifically
-        overhead_direct = parse_pgbench_output(tests['overhead']['direct'])
-        overhead_pgbouncer = parse_pgbench_output(tests['overhead']['pgbouncer'])
+        if direct_result and not direct_result['has_errors']:
+            buf.write(
+                f"Direct Connection:\n"
+                f"  TPS: {direct_result['tps']:.2f}\n"
+                f"  Latency: {direct_result['latency']:.2f} ms\n"
+            )
+        else:
+            buf.write(f"Direct Connection: FAILED or ERRORS\n")
         
-        if overhead_direct and overhead_pgbouncer and not overhead_direct['has_errors'] and not overhead_pgbouncer['has_errors']:
-            tps_ratio = overhead_pgbouncer['tps'] / overhead_direct['tps']
-            latency_ratio = overhead_direct['latency'] / overhead_pgbouncer['latency']
+        if pgbouncer_result and not pgbouncer_result['has_errors']:
+            buf.write(
+                f"PgBouncer Connection:\n"
+                f"  TPS: {pgbouncer_result['tps']:.2f}\n"
+                f"  Latency: {pgbouncer_result['latency']:.2f} ms\n"
+            )
             
-            f.write(f"Connection Overhead Test (20 clients, new connection per transaction):\n")
-            f.write(f"- PgBouncer achieved {tps_ratio:.1f}x the throughput of direct connections\n")
-            f.write(f"- PgBouncer reduced latency by {(1-1/latency_ratio)*100:.0f}%\n")
-            f.write(f"- This demonstrates the massive overhead of connection establishment\n\n")
-        
-        # Check extreme test
-        extreme_direct = parse_pgbench_output(tests['extreme']['direct'])
-        extreme_pgbouncer = parse_pgbench_output(tests['extreme']['pgbouncer'])
+            # Calculate improvements if both tests succeeded
+            if direct_result and not direct_result['has_errors']:
+                if direct_result['tps'] > 0:
+                    tps_improvement = (pgbouncer_result['tps'] / direct_result['tps'] - 1) * 100
+                    buf.write(f"  TPS Improvement: {tps_improvement:+.1f}%\n")
+                
+                if direct_result['latency'] > 0:
+                    latency_improvement = (1 - pgbouncer_result['latency'] / direct_result['latency']) * 100
+                    buf.write(f"  Latency Improvement: {latency_improvement:+.1f}%\n")
+        else:
+            buf.write(f"PgBouncer Connection: FAILED or ERRORS\n")
+    
+    buf.write(
+        "\n\nKEY FINDINGS\n"
+        f"{'-' * 20}\n"
+    )
+    
+    # Analyze overhead test specifically
+    overhead_direct = parsed['overhead']['direct']
+    overhead_pgbouncer = parsed['overhead']['pgbouncer']
+    
+    if overhead_direct and overhead_pgbouncer and not overhead_direct['has_errors'] and not overhead_pgbouncer['has_errors']:
+        tps_ratio = overhead_pgbouncer['tps'] / overhead_direct['tps']
+        latency_ratio = overhead_direct['latency'] / overhead_pgbouncer['latency']
         
-        if extreme_direct and extreme_direct['has_errors']:
-            f.write(f"High Concurrency Test (1000 clients):\n")
-            f.write(f"- Direct connections FAILED as expected (connection limit exceeded)\n")
-            
-            if extreme_pgbouncer and not extreme_pgbouncer['has_errors']:
-                f.write(f"- PgBouncer successfully handled all 1000 clients\n")
-                f.write(f"- Achieved {extreme_pgbouncer['tps']:.0f} TPS with 1000 concurrent clients\n")
-            f.write(f"- This demonstrates PgBouncer's ability to handle connection multiplexing\n\n")
+        buf.write(
+            f"Connection Overhead Test (20 clients, new connection per transaction):\n"
+            f"- PgBouncer achieved {tps_ratio:.1f}x the throughput of direct connections\n"
+            f"- PgBouncer reduced latency by {(1-1/latency_ratio)*100:.0f}%\n"
+            f"- This demonstrates the massive overhead of connection establishment\n\n"
+        )
+    
+    # Check extreme test
+    extreme_direct = parsed['extreme']['direct']
+    extreme_pgbouncer = parsed['extreme']['pgbouncer']
+    
+    if extreme_direct and extreme_direct['has_errors']:
+        buf.write(
+            f"High Concurrency Test (1000 clients):\n"
+            f"- Direct connections FAILED as expected (connection limit exceeded)\n"
+        )
         
-        f.write("CONCLUSION:\n")
-        f.write("PgBouncer provides significant benefits:\n")
-        f.write("1. Eliminates connection establishment overhead\n")
-        f.write("2. Enables high concurrency beyond database limits\n")
-        f.write("3. Improves both throughput and latency\n")
-        f.write("4. Provides reliable connection pooling and queuing\n")
+        if extreme_pgbouncer and not extreme_pgbouncer['has_errors']:
+            buf.write(
+                f"- PgBouncer successfully handled all 1000 clients\n"
+                f"- Achieved {extreme_pgbouncer['tps']:.0f} TPS with 1000 concurrent clients\n"
+            )
+        buf.write(f"- This demonstrates PgBouncer's ability to handle connection multiplexing\n\n")
+    
+    buf.write(_REPORT_CONCLUSION)
+    
+    report = buf.getvalue()
+    with open(summary_file, 'w') as f:
+        f.write(report)
     
     print(f"Analysis complete! Summary saved to: {summary_file}")
     
     # Print summary to console
-    with open(summary_file, 'r') as f:
-        print("\n" + f.read())
+    print("\n" + report)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,73 +3,177 @@
 import sys
 import re
 import os
+import mmap
+import io
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+# The pgbench summary is printed at the end of the log; only this many
+# trailing bytes are read to extract it
+_TAIL_BYTES = 8192
+
+# pgbench summary labels mapped to (result field, type). Every label starts a
+# line and is followed by ':' or '=' and its value, so one pattern reads them all.
+_SUMMARY_FIELDS = {
+    'tps': ('tps', float),
+    'latency average': ('latency', float),
+    'latency stddev': ('latency_stddev', float),
+    'scaling factor': ('scaling_factor', int),
+    'number of clients': ('clients', int),
+    'number of transactions per client': ('transactions_per_client', int),
+    'number of transactions actually processed': ('transactions_processed', int)
+}
+_SUMMARY_RE = re.compile(
+    r'^(' + '|'.join(re.escape(label) for label in _SUMMARY_FIELDS) + r')[ :=]+([0-9.]+)',
+    re.MULTILINE
+)
+
+# Error keywords are counted over the whole log in blocks of this size
+_BLOCK_SIZE = 1024 * 1024
+
+# Error classification keywords, counted case-insensitively
+_ERROR_KEYWORDS = {
+    'connection_refused': (b'connection refused', b'could not connect'),
+    'too_many_clients': (b'too many clients', b'connection limit'),
+    'timeout_errors': (b'timeout', b'timed out'),
+    'authentication_failed': (b'authentication failed', b'password authentication')
+}
+
+# Phrases containing two keywords of the same type (PostgreSQL's usual
+# "password authentication failed" message); counted once, not twice
+_OVERLAPPING_KEYWORDS = {
+    'authentication_failed': (b'password authentication failed',)
+}
+
+# Server message severities, counted case-sensitively
+_SEVERITY_KEYWORDS = {
+    'fatal_errors': b'FATAL:',
+    'generic_errors': b'ERROR:'
+}
+
+# Bytes carried over between blocks so a keyword split across a block
+# boundary is still counted
+_CARRY_BYTES = max(
+    len(keyword)
+    for keywords in [*_ERROR_KEYWORDS.values(), *_OVERLAPPING_KEYWORDS.values(), _SEVERITY_KEYWORDS.values()]
+    for keyword in keywords
+) - 1
+
+# Fixed report text, built once at import
+_REPORT_HEADER = (
+    "PgBouncer Performance Test - DETAILED ANALYSIS\n"
+    f"{'=' * 60}\n"
+)
+_REPORT_INTRO = (
+    "This analysis includes comprehensive reliability metrics:\n"
+    "✅ Success/Error Rates\n"
+    "✅ Connection Rejection Counts\n"
+    "✅ Timeout Rates\n"
+    "✅ Error Type Classification\n"
+    "✅ Performance Consistency\n\n"
+)
+
+def _read_tail(log):
+    """Return the last _TAIL_BYTES of a mapped log as text, starting on a full line"""
+    start = max(0, len(log) - _TAIL_BYTES)
+    tail = log[start:].decode('utf-8', 'replace')
+    if start:
+        tail = tail.partition('\n')[2]
+    return tail
+
+def _tally_errors(text):
+    """Count error keywords in a chunk of log bytes"""
+    text_lower = text.lower()
+    counts = {
+        error_type: sum(text_lower.count(keyword) for keyword in keywords)
+        for error_type, keywords in _ERROR_KEYWORDS.items()
+    }
+    for error_type, phrases in _OVERLAPPING_KEYWORDS.items():
+        counts[error_type] -= sum(text_lower.count(phrase) for phrase in phrases)
+    for error_type, keyword in _SEVERITY_KEYWORDS.items():
+        counts[error_type] = text.count(keyword)
+    return counts
+
+def _count_errors(log):
+    """Count error keywords over a whole mapped log, one block at a time"""
+    error_types = dict.fromkeys([*_ERROR_KEYWORDS, *_SEVERITY_KEYWORDS], 0)
+    carry = b''
+    for start in range(0, len(log), _BLOCK_SIZE):
+        text = carry + log[start:start + _BLOCK_SIZE]
+        # Matches wholly inside the carried bytes were counted with the previous block
+        carried = _tally_errors(carry)
+        for error_type, count in _tally_errors(text).items():
+            error_types[error_type] += count - carried[error_type]
+        carry = text[-_CARRY_BYTES:]
+    return error_types
 
 def parse_pgbench_output_detailed(filename):
     """Parse pgbench output to extract comprehensive metrics including reliability"""
-    if not os.path.exists(filename):
+    # A single stat() both checks the log exists and keys the cache, so a
+    # rewritten log (new mtime or size) is parsed again
+    try:
+        stat = os.stat(filename)
+    except OSError:
         return None
     
-    with open(filename, 'r') as f:
-        content = f.read()
-    
-    # Basic performance metrics
-    tps_match = re.search(r'tps = ([0-9.]+)', content)
-    tps = float(tps_match.group(1)) if tps_match else 0
-    
-    latency_match = re.search(r'latency average = ([0-9.]+) ms', content)
-    latency = float(latency_match.group(1)) if latency_match else 0
-    
-    # Advanced latency metrics
-    latency_stddev_match = re.search(r'latency stddev = ([0-9.]+) ms', content)
-    latency_stddev = float(latency_stddev_match.group(1)) if latency_stddev_match else 0
+    return _parse_pgbench_output_detailed(filename, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=64)
+def _parse_pgbench_output_detailed(filename, mtime_ns, size):
+    """Parse a log once per (path, mtime, size); callers must not mutate the result"""
+    if not size:
+        # mmap cannot map an empty file
+        summary, error_types = '', _count_errors(b'')
+    else:
+        # Slice the page-cache mapping directly instead of reading into buffers
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+            summary = _read_tail(log)
+            error_types = _count_errors(log)
     
-    # Extract transaction counts
-    scaling_match = re.search(r'scaling factor: ([0-9]+)', content)
-    scaling_factor = int(scaling_match.group(1)) if scaling_match else 0
+    # Without a tps line the run never reported a summary; skip extracting
+    # fields from it (error counts are still needed for the report)
+    if 'tps = ' not in summary:
+        summary = ''
     
-    # Number of clients and transactions
-    clients_match = re.search(r'number of clients: ([0-9]+)', content)
-    clients = int(clients_match.group(1)) if clients_match else 0
+    # Summary metrics; the first occurrence of each wins (older pgbench
+    # prints two tps lines, the first including connection time)
+    fields = {}
+    for match in _SUMMARY_RE.finditer(summary):
+        field, cast = _SUMMARY_FIELDS[match.group(1)]
+        try:
+            fields.setdefault(field, cast(match.group(2)))
+        except ValueError:
+            pass
     
-    transactions_match = re.search(r'number of transactions per client: ([0-9]+)', content)
-    transactions_per_client = int(transactions_match.group(1)) if transactions_match else 0
+    tps = fields.get('tps', 0)
+    latency = fields.get('latency', 0)
+    latency_stddev = fields.get('latency_stddev', 0)
+    scaling_factor = fields.get('scaling_factor', 0)
+    clients = fields.get('clients', 0)
+    transactions_per_client = fields.get('transactions_per_client', 0)
+    transactions_processed = fields.get('transactions_processed', 0)
     
     # Total transactions attempted
     total_transactions_attempted = clients * transactions_per_client
     
-    # Extract actual transactions processed
-    transactions_processed_match = re.search(r'number of transactions actually processed: ([0-9]+)', content)
-    transactions_processed = int(transactions_processed_match.group(1)) if transactions_processed_match else 0
-    
     # Calculate success rate
     success_rate = 0
     if total_transactions_attempted > 0:
         success_rate = (transactions_processed / total_transactions_attempted) * 100
     
-    # Error analysis
-    error_types = {
-        'connection_refused': len(re.findall(r'connection refused|could not connect', content, re.IGNORECASE)),
-        'too_many_clients': len(re.findall(r'too many clients|connection limit', content, re.IGNORECASE)),
-        'timeout_errors': len(re.findall(r'timeout|timed out', content, re.IGNORECASE)),
-        'authentication_failed': len(re.findall(r'authentication failed|password authentication', content, re.IGNORECASE)),
-        'fatal_errors': len(re.findall(r'FATAL:', content)),
-        'generic_errors': len(re.findall(r'ERROR:', content))
-    }
-    
     # Connection rejection count
     total_connection_rejections = error_types['connection_refused'] + error_types['too_many_clients']
     
     # Overall error assessment
-    has_critical_errors = any([
-        error_types['connection_refused'] > 0,
-        error_types['too_many_clients'] > 0,
-        error_types['fatal_errors'] > 0,
+    has_critical_errors = (
         success_rate < 95  # Less than 95% success rate is considered problematic
-    ])
+        or total_connection_rejections > 0
+        or error_types['fatal_errors'] > 0
+    )
     
     # Timeout detection
-    has_timeouts = error_types['timeout_errors'] > 0 or 'timeout' in content.lower()
+    has_timeouts = error_types['timeout_errors'] > 0
     
     # Performance consistency (based on standard deviation)
     performance_consistency = "Good"
@@ -104,55 +208,61 @@ def parse_pgbench_output_detailed(filename):
         
         # Metadata
         'clients': clients,
-        'transactions_per_client': transactions_per_client,
-        'raw_content': content
+        'transactions_per_client': transactions_per_client
     }
 
 def generate_reliability_report(results, test_name, f):
     """Generate detailed reliability section for a test"""
-    f.write(f"\n{test_name.upper()} - RELIABILITY METRICS\n")
-    f.write("-" * 40 + "\n")
+    f.write(
+        f"\n{test_name.upper()} - RELIABILITY METRICS\n"
+        f"{'-' * 40}\n"
+    )
     
     for connection_type, result in results.items():
         if result is None:
             f.write(f"{connection_type.title()}: NO DATA\n")
             continue
             
-        f.write(f"\n{connection_type.title()} Connection:\n")
-        
-        # Success/Error Rates
-        f.write(f"  Success Rate: {result['success_rate']:.1f}%\n")
-        f.write(f"  Error Rate: {result['error_rate']:.1f}%\n")
-        f.write(f"  Transactions: {result['transactions_processed']}/{result['total_transactions_attempted']}\n")
-        
-        # Connection Issues
+        # Optional lines are empty strings when they don't apply
+        rejections = ""
         if result['connection_rejections'] > 0:
-            f.write(f"  Connection Rejections: {result['connection_rejections']}\n")
+            rejections = f"  Connection Rejections: {result['connection_rejections']}\n"
         
+        timeouts = ""
         if result['timeout_rate'] > 0:
-            f.write(f"  Timeout Rate: {result['timeout_rate']:.1f}%\n")
+            timeouts = f"  Timeout Rate: {result['timeout_rate']:.1f}%\n"
         
-        # Error Breakdown
-        if any(count > 0 for count in result['error_types'].values()):
-            f.write(f"  Error Breakdown:\n")
-            for error_type, count in result['error_types'].items():
-                if count > 0:
-                    f.write(f"    {error_type.replace('_', ' ').title()}: {count}\n")
+        error_lines = "".join(
+            f"    {error_type.replace('_', ' ').title()}: {count}\n"
+            for error_type, count in result['error_types'].items()
+            if count > 0
+        )
+        breakdown = f"  Error Breakdown:\n{error_lines}" if error_lines else ""
         
-        # Performance Consistency
-        f.write(f"  Performance Consistency: {result['performance_consistency']}\n")
+        stddev = ""
         if result['latency_stddev'] > 0:
-            f.write(f"  Latency Std Dev: {result['latency_stddev']:.2f}ms\n")
+            stddev = f"  Latency Std Dev: {result['latency_stddev']:.2f}ms\n"
         
         # Overall Assessment
         if result['has_critical_errors']:
-            f.write(f"  ⚠️  CRITICAL ERRORS DETECTED\n")
+            assessment = "⚠️  CRITICAL ERRORS DETECTED"
         elif result['success_rate'] >= 99:
-            f.write(f"  ✅ EXCELLENT RELIABILITY\n")
+            assessment = "✅ EXCELLENT RELIABILITY"
         elif result['success_rate'] >= 95:
-            f.write(f"  ✅ GOOD RELIABILITY\n")
+            assessment = "✅ GOOD RELIABILITY"
         else:
-            f.write(f"  ⚠️  POOR RELIABILITY\n")
+            assessment = "⚠️  POOR RELIABILITY"
+        
+        f.write(
+            f"\n{connection_type.title()} Connection:\n"
+            f"  Success Rate: {result['success_rate']:.1f}%\n"
+            f"  Error Rate: {result['error_rate']:.1f}%\n"
+            f"  Transactions: {result['transactions_processed']}/{result['total_transactions_attempted']}\n"
+            f"{rejections}{timeouts}{breakdown}"
+            f"  Performance Consistency: {result['performance_consistency']}\n"
+            f"{stddev}"
+            f"  {assessment}\n"
+        )
 
 def main():
     if len(sys.argv) < 3:
@@ -180,63 +290,70 @@ def main():
     
     summary_file = f"{results_dir}/detailed_analysis_{timestamp}.txt"
     
-    with open(summary_file, 'w') as f:
-        f.write("PgBouncer Performance Test - DETAILED ANALYSIS\n")
-        f.write("=" * 60 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        f.write("This analysis includes comprehensive reliability metrics:\n")
-        f.write("✅ Success/Error Rates\n")
-        f.write("✅ Connection Rejection Counts\n") 
-        f.write("✅ Timeout Rates\n")
-        f.write("✅ Error Type Classification\n")
-        f.write("✅ Performance Consistency\n\n")
-        
-        # Parse all results
-        all_results = {}
-        for test_name, files in tests.items():
-            all_results[test_name] = {
-                'direct': parse_pgbench_output_detailed(files['direct']),
-                'pgbouncer': parse_pgbench_output_detailed(files['pgbouncer'])
-            }
-        
-        # Generate performance summary (existing functionality)
-        f.write("PERFORMANCE SUMMARY\n")
-        f.write("=" * 30 + "\n")
-        
-        for test_name, results in all_results.items():
-            f.write(f"\n{test_name.upper()} TEST\n")
-            f.write("-" * 20 + "\n")
-            
-            for conn_type, result in results.items():
-                if result and result['success_rate'] >= 95:
-                    f.write(f"{conn_type.title()}: {result['tps']:.1f} TPS, {result['latency']:.1f}ms avg\n")
-                else:
-                    f.write(f"{conn_type.title()}: FAILED or POOR RELIABILITY\n")
-        
-        # Generate detailed reliability reports
-        f.write("\n\nRELIABILITY ANALYSIS\n")
-        f.write("=" * 30 + "\n")
-        
-        for test_name, results in all_results.items():
-            generate_reliability_report(results, test_name, f)
+    buf = io.StringIO()
+    buf.write(_REPORT_HEADER)
+    buf.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    buf.write(_REPORT_INTRO)
+    
+    # Parse all results; the logs are independent, so read them concurrently
+    paths = [path for files in tests.values() for path in files.values()]
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        parsed = dict(zip(paths, executor.map(parse_pgbench_output_detailed, paths)))
+    all_results = {
+        test_name: {conn_type: parsed[path] for conn_type, path in files.items()}
+        for test_name, files in tests.items()
+    }
+    
+    # Generate performance summary (existing functionality)
+    buf.write(
+        "PERFORMANCE SUMMARY\n"
+        f"{'=' * 30}\n"
+    )
+    
+    for test_name, results in all_results.items():
+        buf.write(
+            f"\n{test_name.upper()} TEST\n"
+            f"{'-' * 20}\n"
+        )
         
-        # Comparative analysis
-        f.write("\n\nCOMPARATIVE RELIABILITY\n")
-        f.write("=" * 30 + "\n")
+        for conn_type, result in results.items():
+            if result and result['success_rate'] >= 95:
+                buf.write(f"{conn_type.title()}: {result['tps']:.1f} TPS, {result['latency']:.1f}ms avg\n")
+            else:
+                buf.write(f"{conn_type.title()}: FAILED or POOR RELIABILITY\n")
+    
+    # Generate detailed reliability reports
+    buf.write(
+        "\n\nRELIABILITY ANALYSIS\n"
+        f"{'=' * 30}\n"
+    )
+    
+    for test_name, results in all_results.items():
+        generate_reliability_report(results, test_name, buf)
+    
+    # Comparative analysis
+    buf.write(
+        "\n\nCOMPARATIVE RELIABILITY\n"
+        f"{'=' * 30}\n"
+    )
+    
+    for test_name, results in all_results.items():
+        direct = results['direct']
+        pgbouncer = results['pgbouncer']
         
-        for test_name, results in all_results.items():
-            direct = results['direct']
-            pgbouncer = results['pgbouncer']
+        if direct and pgbouncer:
+            buf.write(
+                f"\n{test_name.title()} Test Comparison:\n"
+                f"  Direct Success Rate: {direct['success_rate']:.1f}%\n"
+                f"  PgBouncer Success Rate: {pgbouncer['success_rate']:.1f}%\n"
+                f"  Reliability Improvement: {pgbouncer['success_rate'] - direct['success_rate']:+.1f} percentage points\n"
+            )
             
-            if direct and pgbouncer:
-                f.write(f"\n{test_name.title()} Test Comparison:\n")
-                f.write(f"  Direct Success Rate: {direct['success_rate']:.1f}%\n")
-                f.write(f"  PgBouncer Success Rate: {pgbouncer['success_rate']:.1f}%\n")
-                f.write(f"  Reliability Improvement: {pgbouncer['success_rate'] - direct['success_rate']:+.1f} percentage points\n")
-                
-                if direct['connection_rejections'] > pgbouncer['connection_rejections']:
-                    f.write(f"  ✅ PgBouncer eliminated {direct['connection_rejections'] - pgbouncer['connection_rejections']} connection rejections\n")
+            if direct['connection_rejections'] > pgbouncer['connection_rejections']:
+                buf.write(f"  ✅ PgBouncer eliminated {direct['connection_rejections'] - pgbouncer['connection_rejections']} connection rejections\n")
+    
+    with open(summary_file, 'w') as f:
+        f.write(buf.getvalue())
     
     print(f"Detailed analysis complete! Report saved to: {summary_file}")
 